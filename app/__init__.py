@@ -0,0 +1 @@
+"""Dental marketing AI voice assistant backend."""
@@ -0,0 +1,425 @@
+"""FastAPI entrypoint wiring the service layer and webhook routes.
+
+Production runs behind gunicorn with a uvloop worker:
+
+    gunicorn app.main:app -k uvicorn.workers.UvicornWorker \
+        -w 1 --bind 0.0.0.0:8000
+
+AI sessions live in Redis, but the lead and call-session stores in
+DatabaseService are per-process dicts, so until those move to a shared
+backend the app must run single-worker — with more, a Twilio webhook
+usually lands on a worker that never saw the lead.
+"""
+
+import asyncio
+import functools
+import itertools
+import logging
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Annotated
+from urllib.parse import parse_qsl
+
+import aiohttp
+import orjson
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ValidationError
+
+from app.metrics import ConnectionMetrics, build_trace_config
+from app.models import CallSession, CallStatus, GHLWebhookPayload, Lead
+from app.services.ai_service import AIService
+from app.services.database_service import DatabaseService
+from app.services.dnc_service import DNCService
+from app.services.ghl_service import GHLService
+from app.services.twilio_service import TwilioService
+from app.services.webhook_service import WebhookService
+
+logger = logging.getLogger(__name__)
+
+# Word-boundary match for consent: substring scans over a lowered copy
+# hit false positives ("yesterday") and allocated a new string per call.
+_CONSENT_RE = re.compile(r"\b(yes|yeah|yep|okay|ok|sure|correct)\b", re.IGNORECASE)
+
+# Session ids must be unique under concurrent call starts; a wall-clock
+# float was neither unique nor cheap. time_ns plus a process-local
+# counter is collision-free per worker and allocation-light.
+_SESSION_COUNTER = itertools.count()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The whole app is event-loop bound; running on asyncio's selector
+    # loop instead of uvloop quietly gives up 2-4x webhook throughput,
+    # so surface which loop actually came up.
+    loop_module = type(asyncio.get_running_loop()).__module__
+    if not loop_module.startswith("uvloop"):
+        logger.info("Running on %s; uvloop is not active", loop_module)
+    # One process-wide outbound session: every subsystem that is not
+    # forced onto its own session (GHL binds auth headers, Twilio's async
+    # client owns its pool) shares these warm connections and the DNS
+    # cache instead of paying per-request handshakes.
+    app.state.http_metrics = ConnectionMetrics()
+    app.state.http_session = aiohttp.ClientSession(
+        trace_configs=[build_trace_config(app.state.http_metrics)],
+        connector=aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=10,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True,
+        ),
+        json_serialize=lambda obj: orjson.dumps(obj).decode(),
+    )
+    app.state.ai_service = AIService()
+    app.state.dnc_service = DNCService()
+    app.state.webhook_service = WebhookService(session=app.state.http_session)
+    app.state.database_service = DatabaseService()
+    app.state.ghl_service = GHLService()
+    app.state.twilio_service = TwilioService()
+    await app.state.ai_service.healthcheck()
+    await app.state.database_service.connect()
+    await app.state.ghl_service.connect()
+    await app.state.webhook_service.start()
+    yield
+    await app.state.webhook_service.stop()
+    await app.state.twilio_service.close()
+    await app.state.ghl_service.close()
+    await app.state.database_service.disconnect()
+    await app.state.ai_service.aclose()
+    await app.state.http_session.close()
+
+
+# ORJSONResponse keeps dict responses off stdlib json.dumps; TwiML
+# routes return XML Responses directly and are unaffected.
+app = FastAPI(
+    title="Dental Voice Assistant",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+# The TwiML payloads (<Say> text) cross the WAN to Twilio on every
+# turn; compress anything past half a KB.
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "dnc_count": app.state.dnc_service.get_dnc_count(),
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    m = app.state.http_metrics
+    connector = app.state.http_session.connector
+    body = (
+        "# TYPE outbound_http_requests_total counter\n"
+        f"outbound_http_requests_total {m.request_count}\n"
+        "# TYPE outbound_http_errors_total counter\n"
+        f"outbound_http_errors_total {m.error_count}\n"
+        "# TYPE outbound_http_active_requests gauge\n"
+        f"outbound_http_active_requests {m.active_requests}\n"
+        "# TYPE outbound_http_pool_limit gauge\n"
+        f"outbound_http_pool_limit {connector.limit}\n"
+        "# TYPE outbound_http_response_time_ema_ms gauge\n"
+        f"outbound_http_response_time_ema_ms {m.ema_response_time_ms:.3f}\n"
+    )
+    return Response(body, media_type="text/plain; version=0.0.4")
+
+
+# ----------------------------------------------------------------------
+# GHL inbound webhook
+# ----------------------------------------------------------------------
+
+
+# Real GHL contact payloads are a few KB; anything bigger is junk and
+# gets rejected from the headers alone.
+MAX_WEBHOOK_BYTES = 65536
+
+
+def _validate_lead_data(lead: Lead) -> bool:
+    return bool(lead.id and lead.phone)
+
+
+# One constant template; the only variation is the first name, and the
+# same leads re-enter the funnel often enough that the LRU usually hands
+# back a previously rendered greeting.
+_GREETING_TMPL = (
+    "Hello {name}, this is Nova, the virtual assistant from Premier "
+    "Dental. I'm calling about the appointment request you just sent "
+    "us. I'd like to ask a few quick questions so we can match you "
+    "with the right provider. Is now an okay time to talk?"
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _create_personalized_greeting(name: str) -> str:
+    return _GREETING_TMPL.format(name=name or "there")
+
+
+async def _initiate_qualification_call(lead: Lead) -> None:
+    call_sid = await app.state.twilio_service.initiate_qualification_call(lead)
+    if call_sid is None:
+        await app.state.webhook_service.emit(
+            "call.failed", {"lead_id": lead.id}, urgent=True
+        )
+
+
+@app.post("/webhook/ghl")
+async def handle_ghl_webhook(request: Request, background_tasks: BackgroundTasks):
+    # Shed obviously forged or malformed traffic on the headers alone:
+    # no body read, no HMAC, no JSON parse.
+    signature = request.headers.get("X-Signature-256")
+    if signature is None:
+        raise HTTPException(status_code=401, detail="Missing signature")
+    content_length = request.headers.get("content-length", "")
+    if not content_length.isdigit() or int(content_length) > MAX_WEBHOOK_BYTES:
+        raise HTTPException(status_code=413, detail="Payload too large")
+    if request.headers.get("content-type", "").split(";", 1)[0] != "application/json":
+        raise HTTPException(status_code=415, detail="Unsupported content type")
+    payload_bytes = await request.body()
+    if not app.state.webhook_service.verify_webhook_signature(signature, payload_bytes):
+        raise HTTPException(status_code=401, detail="Invalid signature")
+    try:
+        # orjson takes the raw bytes (no intermediate str) and
+        # model_validate skips the **kwargs expansion.
+        payload_dict = orjson.loads(payload_bytes)
+        webhook_payload = GHLWebhookPayload.model_validate(payload_dict)
+    except (orjson.JSONDecodeError, ValidationError):
+        raise HTTPException(status_code=400, detail="Malformed payload")
+    if webhook_payload.event != "contact.created":
+        return {"status": "ignored"}
+    lead = webhook_payload.to_lead()
+    if not _validate_lead_data(lead):
+        raise HTTPException(status_code=400, detail="Lead is missing required fields")
+    if lead.dnd or app.state.dnc_service.check_dnc_status(lead.phone):
+        return {"status": "skipped", "reason": "dnc"}
+    await app.state.database_service.store_lead(lead)
+    background_tasks.add_task(_initiate_qualification_call, lead)
+    return {"status": "processed", "lead_id": lead.id}
+
+
+# ----------------------------------------------------------------------
+# Twilio voice webhooks
+# ----------------------------------------------------------------------
+
+
+class TwilioVoiceForm(BaseModel):
+    """The handful of fields we consume from Twilio's voice webhooks."""
+
+    CallSid: str = ""
+    CallStatus: str = ""
+    SpeechResult: str = ""
+    AnsweredBy: str = ""
+
+
+async def parse_twilio_form(request: Request) -> TwilioVoiceForm:
+    # Twilio posts application/x-www-form-urlencoded; a bounded parse_qsl
+    # over the raw body skips Starlette's generic multipart machinery.
+    body = await request.body()
+    return TwilioVoiceForm.model_validate(
+        dict(parse_qsl(body.decode("utf-8", "replace"), max_num_fields=64))
+    )
+
+
+@app.post("/voice/start/{lead_id}")
+async def handle_call_start(
+    lead_id: str, form: Annotated[TwilioVoiceForm, Depends(parse_twilio_form)]
+):
+    call_sid = form.CallSid
+    if form.AnsweredBy == "machine_start":
+        return Response(
+            app.state.twilio_service.handle_machine_detection(),
+            media_type="application/xml",
+        )
+    session_id = f"session_{lead_id}_{time.time_ns():x}_{next(_SESSION_COUNTER):x}"
+    session = CallSession(
+        session_id=session_id,
+        lead_id=lead_id,
+        call_sid=call_sid,
+        status=CallStatus.IN_PROGRESS,
+    )
+    # The insert and the lead fetch have no data dependency, and the
+    # greeting needs only the lead: run the insert concurrently and join
+    # it right before answering, so TwiML costs max-of-two round-trips
+    # instead of their sum.
+    db = app.state.database_service
+    session_task = asyncio.create_task(db.create_call_session(session))
+    lead = await db.get_lead(lead_id)
+    if lead is None:
+        await session_task
+        raise HTTPException(status_code=404, detail="Unknown lead")
+    greeting = _create_personalized_greeting(lead.first_name)
+    twiml = app.state.twilio_service.create_initial_twiml(lead_id, greeting)
+    await session_task
+    return Response(twiml, media_type="application/xml")
+
+
+@app.post("/voice/consent/{lead_id}")
+async def handle_consent(
+    lead_id: str, form: Annotated[TwilioVoiceForm, Depends(parse_twilio_form)]
+):
+    twilio_service = app.state.twilio_service
+    if _CONSENT_RE.search(form.SpeechResult):
+        lead = await app.state.database_service.get_lead(lead_id)
+        await app.state.ai_service.start_session(
+            lead_id,
+            lead.first_name if lead is not None else "there",
+            form.CallSid or None,
+        )
+        first_question = (
+            "Great! To start, what's the main issue you'd like the dentist "
+            "to look at?"
+        )
+        return Response(
+            twilio_service.create_conversation_twiml(first_question, lead_id),
+            media_type="application/xml",
+        )
+    return Response(
+        twilio_service.create_completion_twiml(False), media_type="application/xml"
+    )
+
+
+async def _drain_turn_audio(result) -> bool:
+    """Wait out the turn's TTS tasks so the MP3s are in Redis before
+    Twilio fetches them; returns False when synthesis failed and the
+    turn should fall back to <Say>.
+
+    Synthesis overlapped generation, so by the time the reply text is
+    ready this usually only waits on the tail sentence.
+    """
+    try:
+        async for _ in result["audio"]:
+            pass
+    except Exception:
+        logger.exception("TTS synthesis failed; falling back to <Say>")
+        return False
+    return bool(result["audio_keys"])
+
+
+@app.get("/voice/audio/{digest}")
+async def serve_tts_audio(digest: str):
+    """Serve a cached synthesized sentence; <Play> URLs point here.
+
+    Twilio resolves the relative URLs in the TwiML against this app, so
+    the audio never leaves Redis until Twilio asks for it.
+    """
+    audio = await app.state.ai_service.get_cached_audio(digest)
+    if audio is None:
+        raise HTTPException(status_code=404, detail="Unknown audio digest")
+    return Response(audio, media_type="audio/mpeg")
+
+
+async def _finalize_call(lead_id: str, call_sid: str, data) -> None:
+    session = await app.state.database_service.get_call_session_by_sid(call_sid)
+    if session is not None:
+        session.qualification_data = data
+        await app.state.database_service.update_call_session_status(
+            session.session_id, CallStatus.COMPLETED
+        )
+        await app.state.ghl_service.process_qualification_results(
+            lead_id, data, session
+        )
+    await app.state.ai_service.cleanup_session(lead_id)
+    await app.state.webhook_service.emit(
+        "call.qualified",
+        {"lead_id": lead_id, "qualification": data.model_dump(mode="json")},
+    )
+
+
+@app.post("/voice/process/{lead_id}")
+async def handle_conversation(
+    lead_id: str,
+    form: Annotated[TwilioVoiceForm, Depends(parse_twilio_form)],
+    background_tasks: BackgroundTasks,
+):
+    speech_result = form.SpeechResult
+    twilio_service = app.state.twilio_service
+    try:
+        result = await app.state.ai_service.process_conversation_turn(
+            lead_id, speech_result
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="No active session")
+    data = result["qualification_data"]
+    if result["escalate"]:
+        await app.state.webhook_service.emit(
+            "call.escalated",
+            {"lead_id": lead_id, "reason": data.escalation_reason},
+            urgent=True,
+        )
+        return Response(
+            twilio_service.create_escalation_twiml(
+                data.escalation_reason or "caller request"
+            ),
+            media_type="application/xml",
+        )
+    # Play the Polly audio we already paid for instead of re-reading the
+    # reply through <Say>.
+    have_audio = await _drain_turn_audio(result)
+    audio_urls = [f"/voice/audio/{digest}" for digest in result["audio_keys"]]
+    if result["complete"]:
+        background_tasks.add_task(_finalize_call, lead_id, form.CallSid, data)
+        if have_audio:
+            return Response(
+                twilio_service.create_goodbye_play_twiml(audio_urls),
+                media_type="application/xml",
+            )
+        return Response(
+            twilio_service.create_completion_twiml(data.preferred_slot is not None),
+            media_type="application/xml",
+        )
+    if have_audio:
+        return Response(
+            twilio_service.create_conversation_play_twiml(audio_urls, lead_id),
+            media_type="application/xml",
+        )
+    return Response(
+        twilio_service.create_conversation_twiml(result["response"], lead_id),
+        media_type="application/xml",
+    )
+
+
+@app.post("/voice/status/{lead_id}")
+async def handle_call_status(
+    lead_id: str, form: Annotated[TwilioVoiceForm, Depends(parse_twilio_form)]
+):
+    call_sid = form.CallSid
+    call_status = form.CallStatus
+    if call_status in ("completed", "busy", "failed", "no-answer", "canceled"):
+        db = app.state.database_service
+        session = await db.get_call_session_by_sid(call_sid)
+        if session is not None and session.status == CallStatus.IN_PROGRESS:
+            final = (
+                CallStatus.COMPLETED if call_status == "completed" else CallStatus.FAILED
+            )
+            # Twilio ignores the response body and retries on slow
+            # answers; queue the write and return immediately.
+            db.enqueue_write(db.update_call_session_status(session.session_id, final))
+    # Twilio discards the body; 4+ events per call get an empty 204.
+    return Response(status_code=204)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    if os.getenv("ENV") == "prod":
+        # uvloop roughly doubles asyncio throughput over the selector
+        # loop and httptools replaces the pure-Python HTTP parser.
+        # WORKERS defaults to 1: DatabaseService keeps leads and call
+        # sessions in per-process dicts, so extra workers 404 most
+        # webhook hits (see the module docstring).
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8000,
+            loop="uvloop",
+            http="httptools",
+            workers=int(os.getenv("WORKERS", "1")),
+        )
+    else:
+        uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True, log_level="info")
@@ -0,0 +1,55 @@
+"""Connection and latency metrics for the shared outbound HTTP session.
+
+Pool limits (TCPConnector limit / limit_per_host) were previously tuned
+blind; these counters make saturation and response-time drift visible
+so the numbers can be sized from evidence.
+"""
+
+import time
+from dataclasses import dataclass
+
+import aiohttp
+
+# EMA smoothing factor: ~the last 10 requests dominate the average.
+EMA_ALPHA = 0.2
+
+
+@dataclass(slots=True)
+class ConnectionMetrics:
+    """Counters updated from the aiohttp trace hooks."""
+
+    request_count: int = 0
+    error_count: int = 0
+    active_requests: int = 0
+    ema_response_time_ms: float = 0.0
+
+    def update_response_time(self, elapsed_ms: float) -> None:
+        if self.request_count <= 1:
+            # Seed with the first sample instead of decaying up from 0.
+            self.ema_response_time_ms = elapsed_ms
+            return
+        self.ema_response_time_ms += EMA_ALPHA * (elapsed_ms - self.ema_response_time_ms)
+
+
+def build_trace_config(metrics: ConnectionMetrics) -> aiohttp.TraceConfig:
+    """Trace hooks for a ClientSession: two counter bumps and a clock
+    read per request, nothing heavier on the hot path."""
+
+    async def on_request_start(session, ctx, params):
+        ctx.start = time.monotonic()
+        metrics.request_count += 1
+        metrics.active_requests += 1
+
+    async def on_request_end(session, ctx, params):
+        metrics.active_requests -= 1
+        metrics.update_response_time((time.monotonic() - ctx.start) * 1000.0)
+
+    async def on_request_exception(session, ctx, params):
+        metrics.active_requests -= 1
+        metrics.error_count += 1
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    return trace_config
@@ -0,0 +1,111 @@
+"""Data models shared across the voice-assistant pipeline."""
+
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class PainLevel(str, Enum):
+    NONE = "none"
+    MILD = "mild"          # 1-3 on the 0-10 scale
+    MODERATE = "moderate"  # 4-6
+    SEVERE = "severe"      # 7-10
+
+
+class CallStatus(str, Enum):
+    QUEUED = "queued"
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    ESCALATED = "escalated"
+    FAILED = "failed"
+
+
+class Lead(BaseModel):
+    """Contact pushed to us by the GHL `contact.created` webhook."""
+
+    model_config = ConfigDict(validate_assignment=False)
+
+    id: str
+    first_name: str
+    phone: str
+    email: Optional[str] = None
+    dnd: bool = False
+
+
+class GHLContact(BaseModel):
+    """Contact block inside a GHL webhook envelope (GHL sends camelCase)."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: str
+    first_name: str = Field("", alias="firstName")
+    phone: str = ""
+    email: Optional[str] = None
+    dnd: bool = False
+
+
+class GHLWebhookPayload(BaseModel):
+    """Envelope posted by GHL to /webhook/ghl."""
+
+    event: str
+    contact: GHLContact
+
+    def to_lead(self) -> Lead:
+        # The contact block was already validated when this envelope was
+        # parsed, so model_construct skips a second validation pass on
+        # the webhook critical path. Required-field checks stay with the
+        # route's _validate_lead_data.
+        contact = self.contact
+        return Lead.model_construct(
+            id=contact.id,
+            first_name=contact.first_name,
+            phone=contact.phone,
+            email=contact.email,
+            dnd=contact.dnd,
+        )
+
+
+class QualificationData(BaseModel):
+    """Structured info the assistant collects during a call.
+
+    We deliberately collect only the minimum needed to book an
+    appointment (no clinical history beyond the chief complaint).
+
+    Mutated in place on every conversation turn; values are already
+    vetted by the fast path or the extraction schema, so assignment
+    re-validation stays off.
+    """
+
+    model_config = ConfigDict(validate_assignment=False)
+
+    chief_complaint: Optional[str] = None
+    pain_level: Optional[PainLevel] = None
+    pain_score: Optional[int] = None  # raw 0-10 if the caller gave a number
+    insurance_provider: Optional[str] = None
+    preferred_slot: Optional[str] = None
+    requires_escalation: bool = False
+    escalation_reason: Optional[str] = None
+
+
+class ConversationTurn(BaseModel):
+    model_config = ConfigDict(validate_assignment=False)
+
+    role: str  # "user" | "assistant"
+    content: str
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
+class CallSession(BaseModel):
+    """Per-call state while a lead is on the line."""
+
+    model_config = ConfigDict(validate_assignment=False)
+
+    session_id: str
+    lead_id: str
+    call_sid: Optional[str] = None
+    status: CallStatus = CallStatus.QUEUED
+    qualification_data: QualificationData = Field(default_factory=QualificationData)
+    conversation_history: List[ConversationTurn] = Field(default_factory=list)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
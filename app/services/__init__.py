@@ -0,0 +1 @@
+"""Service layer: AI pipeline, telephony, CRM and compliance integrations."""
@@ -0,0 +1,709 @@
+"""Conversational AI pipeline: STT text in, qualification data + reply out.
+
+The assistant ("Nova") runs a short qualification dialogue with a dental
+lead: chief complaint, pain level, insurance provider, preferred slot.
+Red-flag answers escalate the call to a human immediately.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntFlag
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import ahocorasick
+import boto3
+import httpx
+import msgpack
+import orjson
+from botocore.config import Config as BotoConfig
+import redis.asyncio as aioredis
+from openai import AsyncOpenAI
+
+from app.models import CallSession, CallStatus, PainLevel, QualificationData
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = """You are Nova, a friendly scheduling assistant calling on behalf of a dental clinic.
+Your job is to qualify a new lead for an appointment. You must:
+- Ask exactly one short question at a time (under 25 words).
+- Collect, in order: chief complaint, pain level on a 0-10 scale, dental insurance provider, preferred appointment slot.
+- Never give clinical or medical advice of any kind. If asked, say a dentist will answer that at the appointment.
+- If the caller describes severe pain (8-10), facial swelling with fever, trauma, uncontrolled bleeding, or an allergic reaction, say you are transferring them to the team right away and stop asking questions.
+- Be warm and brief; this is a phone call, not a chat window."""
+
+# Red flags that require an immediate handoff to a human (README: escalation
+# & safety). Matched case-insensitively against the caller's words.
+EMERGENCY_KEYWORDS = [
+    "swelling",
+    "swollen",
+    "fever",
+    "trauma",
+    "accident",
+    "knocked out",
+    "bleeding",
+    "can't breathe",
+    "cannot breathe",
+    "trouble breathing",
+    "allergic",
+    "allergy",
+    "anaphyla",
+    "unbearable",
+    "excruciating",
+    "emergency",
+]
+
+# Carriers we can match without asking the LLM. Keep lowercase.
+INSURANCE_CARRIERS = [
+    "sun life",
+    "manulife",
+    "canada life",
+    "green shield",
+    "blue cross",
+    "desjardins",
+    "delta dental",
+    "cigna",
+    "aetna",
+    "metlife",
+    "guardian",
+    "humana",
+    "united healthcare",
+]
+
+# Pain adjectives we can map straight to a PainLevel without a model call.
+PAIN_WORDS = {
+    "excruciating": PainLevel.SEVERE,
+    "unbearable": PainLevel.SEVERE,
+    "terrible": PainLevel.SEVERE,
+    "awful": PainLevel.SEVERE,
+    "throbbing": PainLevel.MODERATE,
+    "aching": PainLevel.MODERATE,
+    "sore": PainLevel.MILD,
+    "sensitive": PainLevel.MILD,
+    "mild": PainLevel.MILD,
+    "no pain": PainLevel.NONE,
+}
+
+MAX_TURNS = 10
+
+# Red-flag tokens checked against the accumulated chief complaint (which
+# may have been filled by the LLM from wording the keyword scan missed).
+COMPLAINT_RED_FLAGS = frozenset(("swelling", "fever", "trauma", "bleeding"))
+
+
+class Slot(IntFlag):
+    """Qualification slots still to collect, kept as a bitmask per session."""
+
+    COMPLAINT = 1
+    PAIN = 2
+    INSURANCE = 4
+    TIME = 8
+
+
+ALL_SLOTS = Slot.COMPLAINT | Slot.PAIN | Slot.INSURANCE | Slot.TIME
+
+# Model field -> slot bit, cleared the moment extraction fills the field.
+FIELD_SLOTS = {
+    "chief_complaint": Slot.COMPLAINT,
+    "pain_level": Slot.PAIN,
+    "insurance_provider": Slot.INSURANCE,
+    "preferred_slot": Slot.TIME,
+}
+
+# Slot bit -> name used when prompting for what is still missing.
+SLOT_FIELDS = {slot: fieldname for fieldname, slot in FIELD_SLOTS.items()}
+
+
+@dataclass(slots=True)
+class TurnLite:
+    """In-session history entry; plain dataclass so hot-path appends skip
+    Pydantic validation. Converted to ConversationTurn only at the API
+    boundary."""
+
+    role: str  # "user" | "assistant"
+    content: str
+    ts: float = field(default_factory=time.time)
+
+
+# Sessions auto-expire so crashed or abandoned calls cannot leak state.
+SESSION_TTL_SECONDS = 1800
+
+# Rolling prompt window; older turns move to the archive for audit.
+HISTORY_WINDOW = 12
+
+# Synthesized audio for recurring phrases (greetings, escalation and
+# wrap-up lines) is reused for a day before Polly sees the text again.
+TTS_CACHE_TTL_SECONDS = 86400
+
+# Replies are cached by (collected data, missing slots, normalized
+# utterance): the long tail of near-identical short answers ("yeah",
+# "yes please", "blue cross") re-asks the same next question, and a
+# Redis hit skips the LLM round-trip entirely. Short TTL keeps stale
+# phrasing from outliving a prompt tweak.
+RESPONSE_CACHE_TTL_SECONDS = 300
+
+# Static extraction instructions live in the system message so the whole
+# prefix stays byte-identical across turns and hits OpenAI's prompt cache;
+# only the utterance and the current snapshot go in the user message.
+EXTRACTION_SYSTEM_PROMPT = SYSTEM_PROMPT + (
+    "\n\nYou are now in extraction mode. Extract dental qualification data "
+    "from the patient's words: chief_complaint, pain_score (0-10), "
+    "insurance_provider, preferred_slot. Use null for anything the patient "
+    "did not say."
+)
+
+# Stable key so every call from this service shares one cache prefix.
+PROMPT_CACHE_KEY = "nova-dental-v1"
+
+# Strict schema for the extraction fallback; with structured outputs the
+# model cannot return malformed JSON, so the prompt no longer pleads for it.
+EXTRACTION_SCHEMA = {
+    "name": "qualification",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "chief_complaint": {"type": ["string", "null"]},
+            "pain_score": {"type": ["integer", "null"], "minimum": 0, "maximum": 10},
+            "insurance_provider": {"type": ["string", "null"]},
+            "preferred_slot": {"type": ["string", "null"]},
+        },
+        "required": ["chief_complaint", "pain_score", "insurance_provider", "preferred_slot"],
+        "additionalProperties": False,
+    },
+}
+
+
+class AIService:
+    """Drives one qualification conversation per active call."""
+
+    def __init__(
+        self,
+        openai_client: Optional[AsyncOpenAI] = None,
+        redis_client: Optional[aioredis.Redis] = None,
+    ):
+        if openai_client is not None:
+            self.openai_client = openai_client
+            self._http_client = None
+        else:
+            # One HTTP/2 client multiplexes every in-flight completion over
+            # a few warm TCP connections; the SDK default is HTTP/1.1 with
+            # a connection per request, which melts under concurrent calls.
+            self._http_client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=256,
+                    max_keepalive_connections=128,
+                    keepalive_expiry=60,
+                ),
+                timeout=httpx.Timeout(30.0, connect=5.0),
+            )
+            self.openai_client = AsyncOpenAI(http_client=self._http_client)
+        self.system_prompt = SYSTEM_PROMPT
+        self.emergency_keywords = EMERGENCY_KEYWORDS
+        # Session state lives in Redis (not a worker-local dict) so any
+        # worker behind the load balancer can serve any turn, and TTLs
+        # garbage-collect sessions whose calls never reached cleanup.
+        self.redis = redis_client or aioredis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            max_connections=64,
+        )
+
+        # Polly is hit on every assistant sentence; keep sockets warm and
+        # the pool wide enough for concurrent calls so synthesis never
+        # re-pays the TLS handshake under burst.
+        self.polly_client = boto3.client(
+            "polly",
+            config=BotoConfig(
+                max_pool_connections=64,
+                retries={"mode": "adaptive", "max_attempts": 3},
+                tcp_keepalive=True,
+            ),
+        )
+        self.voice_id = "Joanna"
+        # Complete sentence (incl. terminator) followed by whitespace; used
+        # to flush finished clauses into TTS while the LLM is still talking.
+        self._sentence_re = re.compile(r"(.+?[.!?])\s+")
+
+        # Fast-path extraction: one alternation mapping scores and pain
+        # adjectives to a level, and one Aho-Corasick automaton holding
+        # emergency keywords and carrier names, so a single pass over the
+        # utterance replaces a per-turn LLM round-trip in the common case.
+        self._pain_map: Dict[str, PainLevel] = {
+            str(score): self._level_from_score(score) for score in range(11)
+        }
+        self._pain_map.update(PAIN_WORDS)
+        self._pain_re = re.compile(
+            r"\b(?:%s)\b"
+            % "|".join(re.escape(k) for k in sorted(self._pain_map, key=len, reverse=True))
+        )
+        # A bare digit only counts as a pain score when the utterance has
+        # pain context (these stems or any mapped adjective); otherwise
+        # "tomorrow at 10" would read as 10/10.
+        self._pain_context_re = re.compile(
+            r"pain|hurt|ach|scale|out of (?:ten|10)|"
+            + "|".join(re.escape(word) for word in PAIN_WORDS)
+        )
+        # Cheap gate for the LLM fallback only: an utterance made purely
+        # of acknowledgements and fillers ("yeah", "okay then", "mmhm")
+        # has nothing for the LLM to extract. The compiled fast-path
+        # scans above are cheap enough to run on every turn regardless.
+        self._ack_only_re = re.compile(
+            r"^(?:\s*(?:yeah|yep|yes|ok|okay|sure|mmhm|mm-hmm|uh huh|uh-huh"
+            r"|right|correct|alright|got it|sounds good|thanks|thank you)"
+            r"[.,!\s]*)+$",
+            re.I,
+        )
+        self._emergency_ac = ahocorasick.Automaton()
+        for keyword in EMERGENCY_KEYWORDS:
+            self._emergency_ac.add_word(keyword, ("emergency", keyword))
+        for carrier in INSURANCE_CARRIERS:
+            self._emergency_ac.add_word(carrier, ("insurance", carrier))
+        self._emergency_ac.make_automaton()
+
+    # ------------------------------------------------------------------
+    # Session lifecycle
+    # ------------------------------------------------------------------
+
+    async def start_session(self, lead_id: str, lead_name: str, call_sid: Optional[str] = None) -> Dict[str, Any]:
+        session = CallSession(
+            session_id=str(uuid.uuid4()),
+            lead_id=lead_id,
+            call_sid=call_sid,
+            status=CallStatus.IN_PROGRESS,
+        )
+        session_context = {
+            "session": session,
+            "lead_name": lead_name,
+            "qualification_data": session.qualification_data,
+            "conversation_history": deque(maxlen=HISTORY_WINDOW),
+            "archived_turns": [],
+            "turn_count": 0,
+            "missing": ALL_SLOTS,
+        }
+        await self._save_session(lead_id, session_context)
+        return session_context
+
+    async def cleanup_session(self, lead_id: str) -> None:
+        await self.redis.delete(f"sess:{lead_id}")
+
+    @staticmethod
+    def _append_turn(session_context: Dict[str, Any], turn: TurnLite) -> None:
+        """Append to the rolling window, spilling the evicted turn to the
+        audit archive so the full transcript survives."""
+        history: "deque[TurnLite]" = session_context["conversation_history"]
+        if len(history) == history.maxlen:
+            session_context["archived_turns"].append(history[0])
+        history.append(turn)
+
+    async def get_session_summary(self, lead_id: str) -> Optional[Dict[str, Any]]:
+        session_context = await self._load_session(lead_id)
+        if session_context is None:
+            return None
+        return {
+            "session_id": session_context["session"].session_id,
+            "turns": len(session_context["conversation_history"])
+            + len(session_context["archived_turns"]),
+            "qualification_data": session_context["qualification_data"],
+            "missing": session_context["missing"],
+        }
+
+    async def healthcheck(self) -> None:
+        """Fail fast at startup if Redis is unreachable."""
+        await self.redis.ping()
+
+    async def aclose(self) -> None:
+        """Release pooled connections; call from the app shutdown hook."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        await self.redis.aclose()
+
+    async def _save_session(self, lead_id: str, session_context: Dict[str, Any]) -> None:
+        payload = msgpack.packb(
+            {
+                "session": session_context["session"].model_dump(),
+                "lead_name": session_context["lead_name"],
+                "qualification_data": session_context["qualification_data"].model_dump(),
+                "conversation_history": [
+                    (turn.role, turn.content, turn.ts)
+                    for turn in session_context["conversation_history"]
+                ],
+                "archived_turns": [
+                    (turn.role, turn.content, turn.ts)
+                    for turn in session_context["archived_turns"]
+                ],
+                "turn_count": session_context["turn_count"],
+                "missing": int(session_context["missing"]),
+            },
+            default=str,  # datetimes
+        )
+        await self.redis.set(f"sess:{lead_id}", payload, ex=SESSION_TTL_SECONDS)
+
+    async def _load_session(self, lead_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.redis.get(f"sess:{lead_id}")
+        if raw is None:
+            return None
+        data = msgpack.unpackb(raw)
+        return {
+            "session": CallSession(**data["session"]),
+            "lead_name": data["lead_name"],
+            "qualification_data": QualificationData(**data["qualification_data"]),
+            "conversation_history": deque(
+                (TurnLite(*turn) for turn in data["conversation_history"]),
+                maxlen=HISTORY_WINDOW,
+            ),
+            "archived_turns": [TurnLite(*turn) for turn in data["archived_turns"]],
+            "turn_count": data["turn_count"],
+            "missing": Slot(data["missing"]),
+        }
+
+    # ------------------------------------------------------------------
+    # Main turn loop
+    # ------------------------------------------------------------------
+
+    async def process_conversation_turn(self, lead_id: str, user_speech: str) -> Dict[str, Any]:
+        """Handle one caller utterance: extract slots, pick the next reply."""
+        session_context = await self._load_session(lead_id)
+        if session_context is None:
+            raise KeyError(f"No active session for lead {lead_id}")
+
+        history: "deque[TurnLite]" = session_context["conversation_history"]
+        self._append_turn(session_context, TurnLite(role="user", content=user_speech))
+        session_context["turn_count"] += 1
+
+        # Extraction only needs the utterance and the pre-turn snapshot, and
+        # generation prompts off the same snapshot, so both LLM calls can
+        # overlap; a slot filled this turn is simply re-asked-free next turn.
+        pre_turn_data = session_context["qualification_data"]
+        # Lowercase once per turn; extraction and the escalation check both
+        # consume the same string instead of re-allocating it.
+        user_lower = user_speech.lower()
+        # Serialize the snapshot once per turn; both prompts interpolate it.
+        pre_turn_json = pre_turn_data.model_dump_json(exclude_none=True)
+        new_missing, ai_response = await asyncio.gather(
+            self._extract_qualification_data(
+                user_speech, user_lower, pre_turn_data, pre_turn_json, session_context["missing"]
+            ),
+            self._generate_ai_response(
+                history,
+                pre_turn_data,
+                session_context["turn_count"],
+                pre_turn_json,
+                session_context["missing"],
+            ),
+        )
+        session_context["missing"] = new_missing
+        extracted = pre_turn_data
+
+        escalation = self._check_escalation_conditions(user_lower, extracted)
+        if escalation:
+            # The generated reply is superseded by the canned handoff
+            # line; stop paying Polly for audio nothing will play.
+            for task in ai_response["audio_tasks"]:
+                task.cancel()
+            extracted.requires_escalation = True
+            extracted.escalation_reason = escalation
+            reply = (
+                "I'm going to connect you with our team right away so they can "
+                "help you directly. Please stay on the line."
+            )
+            self._append_turn(session_context, TurnLite(role="assistant", content=reply))
+            await self._save_session(lead_id, session_context)
+            return {"response": reply, "escalate": True, "qualification_data": extracted}
+        reply = ai_response["response"]
+        self._append_turn(session_context, TurnLite(role="assistant", content=reply))
+        await self._save_session(lead_id, session_context)
+        return {
+            "response": reply,
+            "escalate": False,
+            "complete": ai_response["complete"],
+            "audio": ai_response["audio"],
+            "audio_keys": ai_response["audio_keys"],
+            "qualification_data": extracted,
+        }
+
+    # ------------------------------------------------------------------
+    # Extraction
+    # ------------------------------------------------------------------
+
+    async def _extract_qualification_data(
+        self,
+        user_input: str,
+        user_lower: str,
+        current_data: QualificationData,
+        current_data_json: str,
+        missing: Slot,
+    ) -> Slot:
+        """Pull structured slots out of one utterance.
+
+        Fast path first: a compiled digit pattern for the pain score plus a
+        single automaton pass for emergency keywords and carrier names.
+        The LLM is only consulted when the fast path found nothing and
+        slots are still missing.
+        """
+        updates: Dict[str, Any] = {}
+
+        if missing & Slot.PAIN:
+            score, level = self._normalize_pain_level(user_lower)
+            if score is not None and self._pain_context_re.search(user_lower) is None:
+                # A digit with no pain context is a time ("tomorrow at
+                # 10"), not a score.
+                score, level = None, None
+            if score is not None:
+                updates["pain_score"] = score
+            if level is not None:
+                updates["pain_level"] = level
+
+        for _, (kind, value) in self._emergency_ac.iter(user_lower):
+            if kind == "insurance" and current_data.insurance_provider is None:
+                updates["insurance_provider"] = value.title()
+            # Emergency hits are handled by _check_escalation_conditions;
+            # the shared automaton just saves a second scan.
+
+        # 30-50% of turns are bare acknowledgements with nothing to
+        # extract; one regex scan decides instead of a network round-trip.
+        # Any free-form answer still reaches the LLM safety net while any
+        # slot is unfilled — preferred_slot and off-list carriers have no
+        # fast path at all.
+        if (
+            not updates
+            and missing != 0
+            and self._ack_only_re.match(user_input) is None
+        ):
+            llm_updates = await self._extract_with_llm(
+                user_input, current_data, current_data_json
+            )
+            updates.update(llm_updates)
+
+        # Mutate in place rather than re-validating a fresh model per turn;
+        # every value here already went through the fast path or the schema.
+        for key, value in updates.items():
+            setattr(current_data, key, value)
+            slot = FIELD_SLOTS.get(key)
+            if slot is not None:
+                missing &= ~slot
+        return missing
+
+    async def _extract_with_llm(
+        self, user_input: str, current_data: QualificationData, current_data_json: str
+    ) -> Dict[str, Any]:
+        """Fallback slot extraction via the LLM for free-form answers."""
+        extraction_prompt = (
+            f"Known so far: {current_data_json}\n"
+            f"Patient said: {user_input!r}"
+        )
+        try:
+            completion = await self.openai_client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+                    {"role": "user", "content": extraction_prompt},
+                ],
+                response_format={"type": "json_schema", "json_schema": EXTRACTION_SCHEMA},
+                temperature=0,
+                extra_body={"prompt_cache_key": PROMPT_CACHE_KEY},
+            )
+            raw = completion.choices[0].message.content or "{}"
+            data = orjson.loads(raw)
+        except Exception:
+            logger.exception("LLM extraction failed; keeping prior data")
+            return {}
+
+        updates: Dict[str, Any] = {}
+        if data.get("chief_complaint") and current_data.chief_complaint is None:
+            updates["chief_complaint"] = data["chief_complaint"]
+        if data.get("pain_score") is not None and current_data.pain_score is None:
+            updates["pain_score"] = int(data["pain_score"])
+            updates["pain_level"] = self._level_from_score(updates["pain_score"])
+        if data.get("insurance_provider") and current_data.insurance_provider is None:
+            updates["insurance_provider"] = data["insurance_provider"]
+        if data.get("preferred_slot") and current_data.preferred_slot is None:
+            updates["preferred_slot"] = data["preferred_slot"]
+        return updates
+
+    # ------------------------------------------------------------------
+    # Response generation
+    # ------------------------------------------------------------------
+
+    async def _generate_ai_response(
+        self,
+        history: "deque[TurnLite]",
+        qualification_data: QualificationData,
+        turn_count: int,
+        qualification_json: str,
+        missing: Slot,
+    ) -> Dict[str, Any]:
+        """Ask the LLM for the next question (or wrap-up) to speak."""
+        if missing == 0 or turn_count >= MAX_TURNS:
+            reply = (
+                "Perfect, I have everything I need. Our front desk will confirm "
+                "your appointment shortly. Thank you!"
+            )
+            task = asyncio.ensure_future(self._synthesize_sentence(reply))
+            return {
+                "response": reply,
+                "complete": True,
+                "audio": self._drain_audio([task]),
+                "audio_keys": [self.tts_digest(reply)],
+                "audio_tasks": [task],
+            }
+
+        # Exact-match reply cache: hash the conversation-state key and the
+        # whitespace-normalized utterance. TTS for a cached reply is itself
+        # a Redis hit, so the whole turn resolves without leaving Redis.
+        normalized = " ".join(history[-1].content.lower().split())
+        digest = hashlib.blake2b(
+            f"{qualification_json}|{int(missing)}|{normalized}".encode(),
+            digest_size=16,
+        ).hexdigest()
+        cache_key = f"resp:{digest}"
+        cached = await self.redis.get(cache_key)
+        if cached is not None:
+            reply = cached.decode()
+            task = asyncio.ensure_future(self._synthesize_sentence(reply))
+            return {
+                "response": reply,
+                "complete": False,
+                "audio": self._drain_audio([task]),
+                "audio_keys": [self.tts_digest(reply)],
+                "audio_tasks": [task],
+            }
+
+        messages = [{"role": "system", "content": self.system_prompt}]
+        # The deque is already capped at the prompt window; no slicing.
+        for turn in history:
+            messages.append({"role": turn.role, "content": turn.content})
+        messages.append(
+            {
+                "role": "user",
+                "content": (
+                    f"[context] Collected so far: {qualification_json}. "
+                    f"Still missing: {', '.join(SLOT_FIELDS[s] for s in Slot if missing & s)}. "
+                    "Ask the next single question."
+                ),
+            }
+        )
+        # Stream tokens and hand each finished sentence straight to Polly,
+        # so synthesis overlaps generation and first-audio-byte latency is
+        # roughly first_clause(LLM) + first_clause(TTS) rather than the sum
+        # of the full completion and the full synthesis.
+        stream = await self.openai_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=0.4,
+            max_tokens=60,  # questions must stay under 25 words anyway
+            extra_body={"prompt_cache_key": PROMPT_CACHE_KEY},
+            stream=True,
+        )
+        buffer = ""
+        sentences: List[str] = []
+        synth_tasks: List["asyncio.Task[bytes]"] = []
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content or ""
+            buffer += delta
+            while True:
+                match = self._sentence_re.match(buffer)
+                if match is None:
+                    break
+                sentence = match.group(1)
+                buffer = buffer[match.end():]
+                sentences.append(sentence)
+                synth_tasks.append(asyncio.ensure_future(self._synthesize_sentence(sentence)))
+        if buffer.strip():
+            sentences.append(buffer.strip())
+            synth_tasks.append(asyncio.ensure_future(self._synthesize_sentence(buffer.strip())))
+        reply = " ".join(sentences)
+        await self.redis.set(cache_key, reply, ex=RESPONSE_CACHE_TTL_SECONDS)
+        return {
+            "response": reply,
+            "complete": False,
+            "audio": self._drain_audio(synth_tasks),
+            "audio_keys": [self.tts_digest(sentence) for sentence in sentences],
+            "audio_tasks": synth_tasks,
+        }
+
+    @staticmethod
+    def tts_digest(text: str) -> str:
+        """Digest keying one synthesized sentence; doubles as the public
+        handle the audio-serving route uses to fetch the MP3."""
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    async def get_cached_audio(self, digest: str) -> Optional[bytes]:
+        """Fetch a synthesized MP3 by digest for the audio-serving route."""
+        return await self.redis.get(f"tts:{self.voice_id}:{digest}")
+
+    async def _synthesize_sentence(self, text: str) -> bytes:
+        # Canned lines (greeting, escalation, wrap-up) repeat across every
+        # call; a Redis hit turns a 300-800ms Polly round-trip into one GET.
+        cache_key = f"tts:{self.voice_id}:{self.tts_digest(text)}"
+        cached = await self.redis.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # boto3 is blocking; run it in a worker thread so TTS never stalls
+        # the event loop serving other calls.
+        def _synth() -> bytes:
+            response = self.polly_client.synthesize_speech(
+                Text=text, OutputFormat="mp3", VoiceId=self.voice_id
+            )
+            return response["AudioStream"].read()
+
+        audio = await asyncio.to_thread(_synth)
+        await self.redis.set(cache_key, audio, ex=TTS_CACHE_TTL_SECONDS)
+        return audio
+
+    @staticmethod
+    async def _drain_audio(tasks: List["asyncio.Task[bytes]"]) -> AsyncIterator[bytes]:
+        """Yield synthesized chunks in spoken order as they complete."""
+        for task in tasks:
+            yield await task
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _check_escalation_conditions(
+        self, user_lower: str, data: QualificationData
+    ) -> Optional[str]:
+        """Return an escalation reason if the turn tripped a red flag."""
+        if data.pain_score is not None and data.pain_score >= 8:
+            return f"severe pain ({data.pain_score}/10)"
+        if data.pain_level is PainLevel.SEVERE:
+            return "severe pain reported"
+        # One automaton pass matches every emergency keyword at once
+        # instead of a Python-level substring scan per keyword.
+        for _, (kind, keyword) in self._emergency_ac.iter(user_lower):
+            if kind == "emergency":
+                return f"emergency keyword: {keyword}"
+        # Lazy generator short-circuits on the first hit, one lower() only.
+        complaint = (data.chief_complaint or "").lower()
+        if complaint and any(word in complaint for word in COMPLAINT_RED_FLAGS):
+            return "red flag in chief complaint"
+        return None
+
+    def _normalize_pain_level(self, pain_str: str) -> "tuple[Optional[int], Optional[PainLevel]]":
+        """Single compiled-regex scan mapping a score or adjective to a level."""
+        match = self._pain_re.search(pain_str)
+        if match is None:
+            return None, None
+        token = match.group()
+        score = int(token) if token.isdigit() else None
+        return score, self._pain_map[token]
+
+    @staticmethod
+    def _level_from_score(score: int) -> PainLevel:
+        if score <= 0:
+            return PainLevel.NONE
+        elif score <= 3:
+            return PainLevel.MILD
+        elif score <= 6:
+            return PainLevel.MODERATE
+        else:
+            return PainLevel.SEVERE
+
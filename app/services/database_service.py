@@ -0,0 +1,148 @@
+"""Call-log persistence.
+
+Active call sessions are tracked in memory for fast access during the
+call; completed sessions and transcripts are flushed to Postgres
+through a pooled async engine.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Coroutine, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.models import CallSession, CallStatus, Lead
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseService:
+    """Thin persistence layer over a pooled async engine."""
+
+    def __init__(self, database_url: Optional[str] = None):
+        self.database_url = database_url or os.getenv(
+            "DATABASE_URL", "postgresql+asyncpg://localhost/voice_assistant"
+        )
+        self.engine: Optional[AsyncEngine] = None
+        self.session_factory = None
+        self.call_sessions: List[CallSession] = []
+        # Secondary indexes: status webhooks arrive keyed by call SID and
+        # internal callers use session_id; both lookups must be O(1), not
+        # a scan over every live session.
+        self._by_session_id: Dict[str, CallSession] = {}
+        self._by_call_sid: Dict[str, CallSession] = {}
+        self.leads: Dict[str, Lead] = {}
+        # Fire-and-forget writes (status callbacks, call logs) queue here
+        # so webhook handlers answer without waiting on the pool; one
+        # worker drains in order.
+        self._write_queue: "asyncio.Queue[Coroutine[Any, Any, Any]]" = asyncio.Queue(
+            maxsize=10_000
+        )
+        self._writer_task: Optional["asyncio.Task[None]"] = None
+
+    async def connect(self) -> None:
+        # LIFO pooling keeps a hot core of connections (better locality,
+        # overflow connections age out and get reclaimed), and pre-ping
+        # weeds out dead sockets before a request trips over them.
+        self.engine = create_async_engine(
+            self.database_url,
+            pool_size=20,
+            max_overflow=30,
+            pool_timeout=30,
+            pool_recycle=1800,
+            pool_pre_ping=True,
+            pool_use_lifo=True,
+        )
+        self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False)
+        self._writer_task = asyncio.create_task(self._write_loop())
+
+    async def disconnect(self) -> None:
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        # Land whatever is still queued before the pool goes away.
+        while not self._write_queue.empty():
+            await self._run_write(self._write_queue.get_nowait())
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = None
+            self.session_factory = None
+
+    def enqueue_write(self, coro: Coroutine[Any, Any, Any]) -> None:
+        """Queue a fire-and-forget write; callers do not wait for it."""
+        try:
+            self._write_queue.put_nowait(coro)
+        except asyncio.QueueFull:
+            coro.close()
+            logger.warning("DB write queue full; dropping a queued write")
+
+    async def _write_loop(self) -> None:
+        while True:
+            await self._run_write(await self._write_queue.get())
+
+    @staticmethod
+    async def _run_write(coro: Coroutine[Any, Any, Any]) -> None:
+        try:
+            await coro
+        except Exception:
+            logger.exception("Queued DB write failed")
+
+    async def store_lead(self, lead: Lead) -> Lead:
+        self.leads[lead.id] = lead
+        return lead
+
+    async def get_lead(self, lead_id: str) -> Optional[Lead]:
+        return self.leads.get(lead_id)
+
+    async def create_call_session(self, session: CallSession) -> CallSession:
+        self.call_sessions.append(session)
+        self._by_session_id[session.session_id] = session
+        if session.call_sid:
+            self._by_call_sid[session.call_sid] = session
+        return session
+
+    def set_call_sid(self, session_id: str, call_sid: str) -> None:
+        """Index the session by its Twilio SID once the call is placed."""
+        session = self._by_session_id.get(session_id)
+        if session is not None:
+            session.call_sid = call_sid
+            self._by_call_sid[call_sid] = session
+
+    async def get_call_session(self, session_id: str) -> Optional[CallSession]:
+        return self._by_session_id.get(session_id)
+
+    async def get_call_session_by_sid(self, call_sid: str) -> Optional[CallSession]:
+        return self._by_call_sid.get(call_sid)
+
+    async def update_call_session_status(self, session_id: str, status: CallStatus) -> bool:
+        session = self._by_session_id.get(session_id)
+        if session is None:
+            return False
+        session.status = status
+        return True
+
+    async def save_call_log(self, session: CallSession, transcript: str) -> None:
+        """Write the finished call out through the pooled engine."""
+        if self.session_factory is None:
+            logger.warning("save_call_log called before connect(); dropping log")
+            return
+        async with self.session_factory() as db:
+            await db.execute(
+                text(
+                    "INSERT INTO call_logs (session_id, lead_id, status, transcript)"
+                    " VALUES (:session_id, :lead_id, :status, :transcript)"
+                ),
+                {
+                    "session_id": session.session_id,
+                    "lead_id": session.lead_id,
+                    "status": session.status.value,
+                    "transcript": transcript,
+                },
+            )
+            await db.commit()
@@ -0,0 +1,143 @@
+"""Do-not-call compliance.
+
+Keeps the in-memory DNC set used to gate every outbound dial. Numbers
+land here from GHL DND flags, explicit opt-outs during calls, and bulk
+imports of the national registry extract.
+"""
+
+import functools
+import logging
+import time
+from typing import Dict, Iterable, Optional
+
+import marisa_trie
+from pybloom_live import ScalableBloomFilter
+from pyroaring import BitMap64
+
+logger = logging.getLogger(__name__)
+
+# How long a cached DNC count stays fresh for health probes.
+COUNT_TTL_SECONDS = 5.0
+
+# Deletion table for bytes.translate: a single C-level pass keeps ASCII
+# digits, several times faster than a regex sub on these short strings.
+_NON_DIGIT_BYTES = bytes(b for b in range(256) if not 0x30 <= b <= 0x39)
+
+
+class DNCService:
+    """Membership checks against the do-not-call list."""
+
+    def __init__(self):
+        # Normalized numbers are 11-digit uint64s with heavy area-code
+        # clustering, which Roaring bitmaps compress 10-50x over a Python
+        # set while keeping O(1) membership — national registry extracts
+        # run to hundreds of millions of entries.
+        self.dnc_bitmap = BitMap64()
+        # Optional prefix suppressions ("block all of 1800555..."): a
+        # static marisa trie answers longest-prefix queries in O(|key|),
+        # which a flat membership set cannot express.
+        self.dnc_prefix_trie: Optional[marisa_trie.Trie] = None
+        # Bloom prefilter: almost all checked numbers are not on the list,
+        # and a negative answers in a few cache lines without touching the
+        # bitmap. The 0.1% false positives fall through harmlessly. The
+        # scalable variant grows by stacking filter layers, so a registry
+        # extract larger than the initial sizing degrades lookup speed a
+        # little instead of raising at a fixed capacity.
+        self._bloom = ScalableBloomFilter(
+            initial_capacity=10_000_000,
+            error_rate=0.001,
+            mode=ScalableBloomFilter.LARGE_SET_GROWTH,
+        )
+        # Health probes hit get_dnc_count at ~1Hz per load-balancer
+        # instance; serve a 5s-stale count instead of walking the set
+        # (or querying the backing store) on every probe. Single writer,
+        # so no lock is needed around the refresh.
+        self._cached_count = 0
+        self._count_expires_at = 0.0
+
+    @staticmethod
+    @functools.lru_cache(maxsize=65536)
+    def _normalize_phone_number(phone: str) -> int:
+        """Reduce a phone number to a bare-digit integer with country code.
+
+        Retries and duplicate leads repeat the same raw strings, so the
+        memoized hot path is a dict lookup; staticmethod keeps `self` out
+        of the cache key. Returns 0 when no digits survive.
+        """
+        digits = phone.encode("ascii", "ignore").translate(None, _NON_DIGIT_BYTES).decode()
+        if len(digits) == 10:
+            digits = "1" + digits
+        return int(digits) if digits else 0
+
+    def add_to_dnc_list(self, phone: str, reason: str = "opt_out") -> None:
+        normalized = self._normalize_phone_number(phone)
+        # Bloom first: a bloom-positive that never lands in the bitmap is
+        # a harmless false positive, but a bitmap entry the bloom misses
+        # would make check_dnc_status wave a listed number through.
+        self._bloom.add(normalized)
+        self.dnc_bitmap.add(normalized)
+        logger.info("Added number ending %04d to DNC list (%s)", normalized % 10000, reason)
+
+    def remove_from_dnc_list(self, phone: str) -> bool:
+        normalized = self._normalize_phone_number(phone)
+        # discard hashes once; the size delta says whether it was there.
+        before = len(self.dnc_bitmap)
+        self.dnc_bitmap.discard(normalized)
+        removed = len(self.dnc_bitmap) != before
+        if removed:
+            logger.info("Removed number ending %04d from DNC list", normalized % 10000)
+        return removed
+
+    def bulk_add_to_dnc_list(self, phones: Iterable[str], reason: str = "import") -> int:
+        # Build one bitmap from the batch and union it in C. The bloom
+        # mirror happens before the union: if the load dies partway, the
+        # worst case is bloom-positives for numbers not on the list, never
+        # listed numbers the prefilter would skip.
+        normalized = BitMap64(map(self._normalize_phone_number, phones))
+        for number in normalized:
+            self._bloom.add(number)
+        before = len(self.dnc_bitmap)
+        self.dnc_bitmap |= normalized
+        added = len(self.dnc_bitmap) - before
+        logger.info("Bulk-added %d numbers to DNC list (%s)", added, reason)
+        return added
+
+    def load_prefix_patterns(self, prefixes: Iterable[str]) -> None:
+        """Build the static prefix-suppression index (area codes, exchanges)."""
+        self.dnc_prefix_trie = marisa_trie.Trie(list(prefixes))
+
+    def check_dnc_status(self, phone: str) -> bool:
+        """True if the number must not be called."""
+        normalized = self._normalize_phone_number(phone)
+        # Bloom-negative means definitely not an exact-list hit; only
+        # positives (real or the 0.1% false kind) probe the bitmap.
+        blocked = normalized in self._bloom and normalized in self.dnc_bitmap
+        if not blocked and self.dnc_prefix_trie is not None:
+            blocked = bool(self.dnc_prefix_trie.prefixes(str(normalized)))
+        # Lazy args: the message is never formatted unless DEBUG is on.
+        logger.debug("DNC check for number ending %04d: %s", normalized % 10000, blocked)
+        return blocked
+
+    def check_dnc_statuses(self, phones: Iterable[str]) -> Dict[str, bool]:
+        """Batch membership checks, e.g. gating a whole campaign blast.
+
+        One bitmap intersection in C answers the exact-list question for
+        the entire batch; only the prefix-suppression pass (rarely
+        configured) stays per-number.
+        """
+        normalized = {phone: self._normalize_phone_number(phone) for phone in phones}
+        hits = self.dnc_bitmap & BitMap64(normalized.values())
+        trie = self.dnc_prefix_trie
+        return {
+            phone: number in hits
+            or (trie is not None and bool(trie.prefixes(str(number))))
+            for phone, number in normalized.items()
+        }
+
+    def get_dnc_count(self) -> int:
+        now = time.monotonic()
+        if now < self._count_expires_at:
+            return self._cached_count
+        self._cached_count = len(self.dnc_bitmap)
+        self._count_expires_at = now + COUNT_TTL_SECONDS
+        return self._cached_count
@@ -0,0 +1,229 @@
+"""GoHighLevel (GHL) CRM integration.
+
+Pushes qualification results back onto the lead record: notes, tags,
+pipeline stage, appointment and escalation tasks.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+import orjson
+
+from app.models import CallSession, QualificationData
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://services.leadconnectorhq.com/"
+API_VERSION = "2021-07-28"
+
+# Pipeline stages are near-static GHL configuration; re-fetch at most
+# every five minutes.
+STAGE_CACHE_TTL_SECONDS = 300.0
+
+# Custom-field keys, zipped against the matching QualificationData values.
+_CUSTOM_FIELD_KEYS = (
+    "chief_complaint",
+    "pain_level",
+    "insurance_provider",
+    "preferred_slot",
+)
+
+# Rendered once per write-back with a single format_map pass; building
+# the note with chained f-string concatenation reallocated per line.
+_NOTES_TEMPLATE = (
+    "AI qualification call {session_id}\n"
+    "Completed: {ts}\n"
+    "Chief complaint: {complaint}\n"
+    "Pain level: {pain}\n"
+    "Insurance: {insurance}\n"
+    "Preferred slot: {slot}\n"
+    "Escalated: {escalated}"
+)
+
+
+class GHLService:
+    """Writes call outcomes back to GHL over one pooled HTTPS session."""
+
+    def __init__(self, api_key: Optional[str] = None, pipeline_id: Optional[str] = None):
+        self.api_key = api_key or os.getenv("GHL_API_KEY", "")
+        self.pipeline_id = pipeline_id or os.getenv("GHL_PIPELINE_ID", "")
+        self.base_url = BASE_URL
+        # Every request targets base + known literal path; skip urljoin's
+        # per-call URL parsing.
+        self._base = BASE_URL.rstrip("/")
+        # Bound once at session construction; no per-request header dict is
+        # passed anywhere, so aiohttp encodes these a single time. The
+        # json= path sets Content-Type itself.
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Version": API_VERSION,
+        }
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._stage_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+
+    async def connect(self) -> None:
+        # One long-lived session; per-request ClientSession objects would
+        # pay a TCP+TLS handshake to leadconnectorhq.com on every call.
+        self._session = aiohttp.ClientSession(
+            headers=self.headers,
+            connector=aiohttp.TCPConnector(
+                limit=100, ttl_dns_cache=300, keepalive_timeout=60
+            ),
+            json_serialize=lambda obj: orjson.dumps(obj).decode(),
+        )
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    # ------------------------------------------------------------------
+    # Low-level API calls
+    # ------------------------------------------------------------------
+
+    async def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        url = f"{self._base}/{path}"
+        try:
+            async with self._session.request(method, url, json=payload) as response:
+                if response.status >= 400:
+                    logger.warning("GHL %s %s returned %d", method, path, response.status)
+                    return None
+                body = await response.read()
+                return orjson.loads(body) if body else {}
+        except aiohttp.ClientError:
+            logger.exception("GHL %s %s failed", method, path)
+            return None
+
+    async def get_contact(self, contact_id: str) -> Optional[Dict[str, Any]]:
+        return await self._request("GET", f"contacts/{contact_id}")
+
+    async def update_contact_notes(self, contact_id: str, note: str) -> Optional[Dict[str, Any]]:
+        return await self._request("POST", f"contacts/{contact_id}/notes", {"body": note})
+
+    async def add_contact_tag(self, contact_id: str, tag: str) -> Optional[Dict[str, Any]]:
+        return await self.add_contact_tags(contact_id, [tag])
+
+    async def add_contact_tags(self, contact_id: str, tags: List[str]) -> Optional[Dict[str, Any]]:
+        # The endpoint takes an array; one POST covers the whole batch.
+        return await self._request("POST", f"contacts/{contact_id}/tags", {"tags": tags})
+
+    async def update_contact_stage(self, contact_id: str, stage_id: str) -> Optional[Dict[str, Any]]:
+        return await self._request(
+            "PUT",
+            f"opportunities/{contact_id}",
+            {"pipelineId": self.pipeline_id, "stageId": stage_id},
+        )
+
+    async def create_appointment(self, contact_id: str, slot: str) -> Optional[Dict[str, Any]]:
+        return await self._request(
+            "POST",
+            "appointments/",
+            {"contactId": contact_id, "startTime": slot, "title": "Dental consultation"},
+        )
+
+    async def create_task(
+        self, contact_id: str, title: str, body: str, due: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        due_date = due if due is not None else datetime.utcnow()
+        return await self._request(
+            "POST",
+            f"contacts/{contact_id}/tasks",
+            {"title": title, "body": body, "dueDate": due_date.isoformat()},
+        )
+
+    async def get_pipeline_stages(self, pipeline_id: str) -> List[Dict[str, Any]]:
+        cached = self._stage_cache.get(pipeline_id)
+        if cached is not None and time.monotonic() - cached[0] < STAGE_CACHE_TTL_SECONDS:
+            return cached[1]
+        data = await self._request("GET", f"pipelines/{pipeline_id}")
+        if data is None:
+            # Serve stale config rather than nothing when GHL hiccups.
+            return cached[1] if cached is not None else []
+        stages = data.get("stages", [])
+        self._stage_cache[pipeline_id] = (time.monotonic(), stages)
+        return stages
+
+    # ------------------------------------------------------------------
+    # Qualification write-back
+    # ------------------------------------------------------------------
+
+    def _create_custom_fields(self, data: QualificationData) -> List[Dict[str, Any]]:
+        values = (
+            data.chief_complaint,
+            data.pain_level.value if data.pain_level else None,
+            data.insurance_provider,
+            data.preferred_slot,
+        )
+        return [
+            {"key": key, "value": value}
+            for key, value in zip(_CUSTOM_FIELD_KEYS, values)
+            if value is not None
+        ]
+
+    @staticmethod
+    def _format_qualification_notes(
+        data: QualificationData, session: CallSession, now: datetime
+    ) -> str:
+        return _NOTES_TEMPLATE.format_map(
+            {
+                "session_id": session.session_id,
+                "ts": now.isoformat(),
+                "complaint": data.chief_complaint or "n/a",
+                "pain": data.pain_level.value if data.pain_level else "n/a",
+                "insurance": data.insurance_provider or "n/a",
+                "slot": data.preferred_slot or "n/a",
+                "escalated": data.requires_escalation,
+            }
+        )
+
+    async def process_qualification_results(
+        self, contact_id: str, data: QualificationData, session: CallSession
+    ) -> Dict[str, Any]:
+        """Push everything we learned on the call back onto the lead."""
+        # One clock read covers the note, the task body and its due date.
+        now = datetime.utcnow()
+        note = self._format_qualification_notes(data, session, now)
+        tags = ["ai-qualified"]
+        if data.requires_escalation:
+            tags.append("needs-human-review")
+        if data.insurance_provider:
+            tags.append("has-insurance")
+
+        # All of these REST calls are independent; overlap the round-trips
+        # instead of paying one RTT per call in sequence.
+        keys = ["notes", "tags"]
+        calls = [
+            self.update_contact_notes(contact_id, note),
+            self.add_contact_tags(contact_id, tags),
+        ]
+        if data.preferred_slot:
+            keys.append("appointment")
+            calls.append(self.create_appointment(contact_id, data.preferred_slot))
+        if data.requires_escalation:
+            keys.append("task")
+            calls.append(
+                self.create_task(
+                    contact_id,
+                    "Escalated AI call",
+                    f"Reason: {data.escalation_reason or 'unspecified'}"
+                    f" ({now.isoformat()})",
+                    due=now + timedelta(hours=2),
+                )
+            )
+
+        outcomes = await asyncio.gather(*calls, return_exceptions=True)
+        # Accumulate in locals (LOAD_FAST appends) and materialize the
+        # results dict once at the end instead of per-key hash writes.
+        values: List[Any] = []
+        for key, outcome in zip(keys, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.warning("GHL write-back %s failed: %r", key, outcome)
+                values.append(None)
+            else:
+                values.append(outcome)
+        return dict(zip(keys, values))
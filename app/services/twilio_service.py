@@ -0,0 +1,249 @@
+"""Outbound calling via Twilio.
+
+Places the qualification call and renders the TwiML that drives each
+webhook-hit turn of the conversation.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from typing import List, Optional
+from xml.sax.saxutils import escape as _xml_escape
+
+from twilio.base.exceptions import TwilioRestException
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from twilio.rest import Client
+
+from app.models import Lead
+
+logger = logging.getLogger(__name__)
+
+# Twilio enforces an account-level calls-per-second ceiling; dial
+# bursts past it cost a 429 plus a retry round-trip each, so outbound
+# dials are paced client-side instead.
+CALLS_PER_SECOND = float(os.getenv("TWILIO_CALLS_PER_SECOND", "1"))
+MAX_CONCURRENT_DIALS = int(os.getenv("TWILIO_MAX_CONCURRENT_DIALS", "10"))
+
+# TwiML shapes are fixed; only the greeting/prompt text and the lead_id
+# in the action URL vary. Rendering from string templates (and caching
+# the rendered XML) skips the VoiceResponse object tree and its
+# ElementTree serialize on every webhook hit.
+_TWIML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>'
+
+_INITIAL_TMPL = (
+    _TWIML_HEADER
+    + '<Response><Gather action="/voice/consent/{lead_id}" input="speech"'
+    ' method="POST" speechTimeout="auto" timeout="10">'
+    '<Say language="en-US" voice="alice">{greeting}</Say></Gather>'
+    "<Say voice=\"alice\">I didn't catch that. We'll try again another"
+    ' time. Goodbye!</Say><Hangup /></Response>'
+)
+
+_CONV_TMPL = (
+    _TWIML_HEADER
+    + '<Response><Gather action="/voice/process/{lead_id}" input="speech"'
+    ' method="POST" speechModel="phone_call" speechTimeout="auto" timeout="10">'
+    "{body}</Gather></Response>"
+)
+
+_SAY_TMPL = '<Say language="en-US" voice="alice">{text}</Say>'
+
+_GOODBYE_PLAY_TMPL = _TWIML_HEADER + "<Response>{body}<Hangup /></Response>"
+
+_ESCALATION_TMPL = (
+    _TWIML_HEADER
+    + '<Response><Say voice="alice">I\'m connecting you with a member of'
+    " our team now. Please stay on the line.</Say>"
+    "<Dial>{phone}</Dial></Response>"
+)
+
+_COMPLETION_SCHEDULED_TWIML = (
+    _TWIML_HEADER
+    + '<Response><Say voice="alice">Wonderful, you\'re all set. Our team'
+    " will confirm your appointment shortly. Goodbye!</Say>"
+    "<Hangup /></Response>"
+)
+
+_COMPLETION_FOLLOWUP_TWIML = (
+    _TWIML_HEADER
+    + '<Response><Say voice="alice">Thank you for your time. Our team'
+    " will follow up with you soon. Goodbye!</Say><Hangup /></Response>"
+)
+
+_MACHINE_TWIML = (
+    _TWIML_HEADER
+    + '<Response><Say voice="alice">Hello, this is Nova from Premier'
+    " Dental calling about your recent appointment request. Please call"
+    " us back at your convenience so we can get you scheduled."
+    " Goodbye!</Say><Hangup /></Response>"
+)
+
+
+class _TokenBucket:
+    """Minimal async token bucket: refills at ``rate``/s up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        # The lock also queues waiters fairly, so a burst drains in
+        # arrival order.
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
+class TwilioService:
+    """Async Twilio REST client plus the TwiML builders for each call leg."""
+
+    def __init__(self, webhook_base_url: Optional[str] = None):
+        self.account_sid = os.getenv("TWILIO_ACCOUNT_SID", "")
+        self.auth_token = os.getenv("TWILIO_AUTH_TOKEN", "")
+        self.from_number = os.getenv("TWILIO_FROM_NUMBER", "")
+        self.webhook_base_url = (
+            webhook_base_url or os.getenv("WEBHOOK_BASE_URL", "http://localhost:8000")
+        ).rstrip("/")
+        # Callback URLs only vary by lead id; bind the base once so the
+        # dial path formats a constant template instead of re-reading a
+        # mutable attribute into a fresh f-string per call.
+        self._start_tmpl = self.webhook_base_url + "/voice/start/{}"
+        self._status_tmpl = self.webhook_base_url + "/voice/status/{}"
+        # The handoff number never changes at runtime; bind it once and
+        # render the escalation TwiML a single time instead of hitting
+        # os.environ on every escalated call.
+        self.escalation_phone = os.getenv("ESCALATION_PHONE", "+1234567890")
+        self._escalation_twiml = _ESCALATION_TMPL.format(phone=self.escalation_phone)
+        # The async HTTP client keeps one pooled aiohttp session to
+        # api.twilio.com for the life of the process, so concurrent
+        # webhook handlers reuse warm TCP+TLS connections instead of
+        # blocking the event loop inside urllib3 and paying a fresh
+        # handshake per REST call.
+        self._http_client = AsyncTwilioHttpClient()
+        self.client = Client(
+            self.account_sid, self.auth_token, http_client=self._http_client
+        )
+        # Pace dials below the account ceiling and bound how many are
+        # outstanding at once; a GHL campaign blast then queues here
+        # instead of triggering a 429 retry storm.
+        self._dial_bucket = _TokenBucket(
+            CALLS_PER_SECOND, capacity=max(CALLS_PER_SECOND, 1.0)
+        )
+        self._dial_semaphore = asyncio.Semaphore(MAX_CONCURRENT_DIALS)
+
+    async def __aenter__(self) -> "TwilioService":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Release the pooled aiohttp session; call from the shutdown hook."""
+        await self._http_client.close()
+
+    # ------------------------------------------------------------------
+    # REST calls
+    # ------------------------------------------------------------------
+
+    async def initiate_qualification_call(self, lead: Lead) -> Optional[str]:
+        """Place the outbound call; returns the call SID, or None on failure."""
+        twiml_url = self._start_tmpl.format(lead.id)
+        status_callback = self._status_tmpl.format(lead.id)
+        async with self._dial_semaphore:
+            await self._dial_bucket.acquire()
+            try:
+                call = await self.client.calls.create_async(
+                    to=lead.phone,
+                    from_=self.from_number,
+                    url=twiml_url,
+                    status_callback=status_callback,
+                    status_callback_event=[
+                        "initiated",
+                        "ringing",
+                        "answered",
+                        "completed",
+                    ],
+                    machine_detection="Enable",
+                    timeout=30,
+                )
+            except TwilioRestException:
+                logger.exception("Failed to place call for lead %s", lead.id)
+                return None
+        return call.sid
+
+    async def get_call_status(self, call_sid: str) -> Optional[str]:
+        try:
+            call = await self.client.calls(call_sid).fetch_async()
+        except TwilioRestException:
+            logger.exception("Failed to fetch call %s", call_sid)
+            return None
+        return call.status
+
+    async def end_call(self, call_sid: str) -> bool:
+        try:
+            await self.client.calls(call_sid).update_async(status="completed")
+        except TwilioRestException:
+            logger.exception("Failed to end call %s", call_sid)
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # TwiML
+    # ------------------------------------------------------------------
+
+    @functools.lru_cache(maxsize=4096)
+    def create_initial_twiml(self, lead_id: str, greeting: str) -> str:
+        """Greeting plus the consent gather for the start-of-call webhook.
+
+        Greetings vary only by first name, so re-entering leads are an
+        LRU hit and serve a prebuilt string.
+        """
+        return _INITIAL_TMPL.format(lead_id=lead_id, greeting=_xml_escape(greeting))
+
+    def create_conversation_twiml(self, prompt: str, lead_id: str) -> str:
+        """Speak the assistant's reply and gather the caller's next turn.
+
+        The prompt is unique per turn, so there is nothing to memoize;
+        formatting the fixed-shape template still beats building and
+        serializing a VoiceResponse/Gather tree on the hottest route.
+        """
+        return _CONV_TMPL.format(
+            body=_SAY_TMPL.format(text=_xml_escape(prompt)), lead_id=lead_id
+        )
+
+    def create_conversation_play_twiml(self, audio_urls: List[str], lead_id: str) -> str:
+        """Play the synthesized reply (one MP3 per sentence) and gather
+        the caller's next turn."""
+        body = "".join(f"<Play>{url}</Play>" for url in audio_urls)
+        return _CONV_TMPL.format(body=body, lead_id=lead_id)
+
+    def create_goodbye_play_twiml(self, audio_urls: List[str]) -> str:
+        """Play the synthesized wrap-up and hang up."""
+        body = "".join(f"<Play>{url}</Play>" for url in audio_urls)
+        return _GOODBYE_PLAY_TMPL.format(body=body)
+
+    def create_escalation_twiml(self, reason: str = "caller request") -> str:
+        """Bridge the caller to a human; the reason travels via events, not TwiML."""
+        return self._escalation_twiml
+
+    def create_completion_twiml(self, appointment_scheduled: bool) -> str:
+        if appointment_scheduled:
+            return _COMPLETION_SCHEDULED_TWIML
+        return _COMPLETION_FOLLOWUP_TWIML
+
+    def handle_machine_detection(self) -> str:
+        """Voicemail drop when answering-machine detection fires."""
+        return _MACHINE_TWIML
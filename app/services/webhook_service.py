@@ -0,0 +1,125 @@
+"""Outbound event delivery to the clinic's webhook endpoint.
+
+Call-lifecycle events (call started, qualified, escalated, ...) are
+batched so many events share one HTTPS request; only escalations jump
+the queue.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+BATCH_INTERVAL_SECONDS = 0.5
+BATCH_SIZE = 100
+
+
+class WebhookService:
+    """Queues events and flushes them as one batched POST on a timer."""
+
+    def __init__(
+        self,
+        target_url: Optional[str] = None,
+        batch_interval: float = BATCH_INTERVAL_SECONDS,
+        batch_size: int = BATCH_SIZE,
+        webhook_secret: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
+        self.target_url = target_url or os.getenv("EVENT_WEBHOOK_URL", "")
+        self.webhook_secret = webhook_secret or os.getenv("GHL_WEBHOOK_SECRET", "")
+        # The HMAC key schedule (two SHA-256 inits over the padded key)
+        # costs more than hashing a small body; pay it once here and
+        # .copy() the primed state per request.
+        self._hmac_proto = hmac.new(
+            self.webhook_secret.encode("utf-8"), b"", hashlib.sha256
+        )
+        # hashlib dispatches through OpenSSL's EVP layer when the
+        # _hashlib C module is present, which runs the SHA-256 block
+        # function on SHA-NI (ARMv8 SHA2 on ARM). Without it, hashing
+        # drops to the bundled scalar implementation — several times
+        # slower on large payloads — so make a silent downgrade loud.
+        if type(hashlib.sha256()).__module__ != "_hashlib":
+            logger.warning(
+                "OpenSSL-backed SHA-256 unavailable; webhook signature "
+                "checks are using the slower built-in implementation"
+            )
+        self.batch_interval = batch_interval
+        self.batch_size = batch_size
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=10_000)
+        self._flush_task: Optional["asyncio.Task[None]"] = None
+        # Prefer the process-wide session so batches ride the shared
+        # connection pool; only spin up (and later close) a private one
+        # when running standalone, e.g. in scripts.
+        self._session = session
+        self._owns_session = session is None
+
+    async def start(self) -> None:
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        # Deliver whatever is still queued before closing the session.
+        remaining = self._drain(self._queue.qsize())
+        if remaining:
+            await self._post(remaining)
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def verify_webhook_signature(self, signature: str, payload: bytes) -> bool:
+        """Check the HMAC-SHA256 signature GHL sends on inbound webhooks."""
+        mac = self._hmac_proto.copy()
+        mac.update(payload)
+        return hmac.compare_digest(mac.hexdigest(), signature.removeprefix("sha256="))
+
+    async def emit(self, event_type: str, payload: Dict[str, Any], urgent: bool = False) -> None:
+        """Queue one event; urgent events (escalations) post immediately."""
+        event = {"type": event_type, "data": payload, "ts": time.time()}
+        if urgent:
+            await self._post([event])
+            return
+        await self._queue.put(event)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.batch_interval)
+            events = self._drain(self.batch_size)
+            if events:
+                await self._post(events)
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        events: List[Dict[str, Any]] = []
+        while len(events) < limit:
+            try:
+                events.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return events
+
+    async def _post(self, events: List[Dict[str, Any]]) -> None:
+        if not self.target_url or self._session is None:
+            return
+        try:
+            async with self._session.post(
+                self.target_url, json={"events": events}
+            ) as response:
+                if response.status >= 400:
+                    logger.warning(
+                        "Webhook batch of %d rejected with %d", len(events), response.status
+                    )
+        except aiohttp.ClientError:
+            logger.exception("Webhook batch of %d failed", len(events))